@@ -1,14 +1,31 @@
 import locale
+import os
 import pathlib
 import re
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from functools import cmp_to_key
-from typing import Callable, Generator, List, Optional, Tuple
+from functools import cmp_to_key, lru_cache
+from typing import Callable, Generator, Iterator, List, Optional, Tuple
 
 import click
 
 DEFAULT_LOCALE = "en_US.UTF-8"
 
+# Directories containing virtual environments or AWS SAM build artifacts
+EXCLUSION_PATTERN = re.compile(r"(venv|\.venv|virtualenv|\.aws-sam)")
+
+# Directories that never hold requirements.txt files managed by the project
+SKIPPED_DIRECTORIES = frozenset(
+    {".git", "__pycache__", "node_modules", "site-packages"}
+)
+
+# Operators that separate a package name from its version specifier
+VERSION_SPECIFIERS = ("~=", "==", ">=", "<=", "!=", ">", "<")
+
+# Translation tables for matching dashes and underscores in local package paths
+DASHES_TO_UNDERSCORES = str.maketrans("-", "_")
+UNDERSCORES_TO_DASHES = str.maketrans("_", "-")
+
 
 @contextmanager
 def set_locale(new_locale: Optional[str] = None) -> Generator[Callable, None, None]:
@@ -32,6 +49,58 @@ def sort_packages(packages: List[str], locale_: Optional[str] = None) -> List[st
             return sorted(packages, key=cmp_to_key(strcoll))
 
 
+def _is_excluded_directory(name: str) -> bool:
+    """Determine if a directory should not be searched for requirements.txt files"""
+
+    return name in SKIPPED_DIRECTORIES or EXCLUSION_PATTERN.search(name) is not None
+
+
+def _is_in_excluded_directory(path: pathlib.Path) -> bool:
+    """
+    Determine if a path is, or is inside, a directory that should not be searched for
+    requirements.txt files. The path is resolved first so that relative paths such as
+    the current directory are checked against every directory above them.
+    """
+
+    return any(_is_excluded_directory(part) for part in path.resolve().parts)
+
+
+def _scandir_recursive(directory: pathlib.Path) -> Iterator[os.DirEntry]:
+    """
+    Yield the requirements.txt entries below the given directory using os.scandir, which
+    knows an entry's type without an extra stat call. Symlinks are skipped and excluded
+    directories are pruned so their contents are never listed. Directories that vanish
+    or cannot be read while walking are skipped.
+    """
+
+    directories = [str(directory)]
+
+    while directories:
+        current_directory = directories.pop()
+        subdirectories = []
+        try:
+            with os.scandir(current_directory) as entries:
+                for entry in entries:
+                    if entry.is_symlink():
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        if not _is_excluded_directory(entry.name):
+                            subdirectories.append(entry.path)
+                    elif entry.name == "requirements.txt":
+                        yield entry
+        except OSError:
+            continue
+
+        # Visit subdirectories in the order they were listed
+        directories.extend(reversed(subdirectories))
+
+
+def _find_requirements_files(directory: pathlib.Path) -> List[pathlib.Path]:
+    """Find all requirements.txt files below the given directory"""
+
+    return [pathlib.Path(entry.path) for entry in _scandir_recursive(directory)]
+
+
 def gather_requirements_files(paths: List[pathlib.Path]) -> List[pathlib.Path]:
     """
     Find all requirements.txt files in the given paths, ignoring virtual environment/aws-sam
@@ -41,20 +110,17 @@ def gather_requirements_files(paths: List[pathlib.Path]) -> List[pathlib.Path]:
 
     for path in paths:
         if path.is_file() and path.name == "requirements.txt":
-            requirements_files.append(path)
+            if not _is_in_excluded_directory(path):
+                requirements_files.append(path)
         elif path.is_dir():
-            requirements_files.extend(pathlib.Path(path).glob("**/requirements.txt"))
+            if not _is_in_excluded_directory(path):
+                requirements_files.extend(_find_requirements_files(path))
         else:
             click.echo(
                 f"'{path}' is not a valid path to a requirements.txt file or directory"
             )
 
-    exclusion_pattern = re.compile(r"(venv|\.venv|virtualenv|\.aws-sam)")
-    filtered_requirements_files = [
-        file for file in requirements_files if not exclusion_pattern.search(str(file))
-    ]
-
-    return filtered_requirements_files
+    return requirements_files
 
 
 def resolve_paths(paths: Tuple[str]) -> List[pathlib.Path]:
@@ -65,13 +131,43 @@ def resolve_paths(paths: Tuple[str]) -> List[pathlib.Path]:
 
     resolved_paths: List[pathlib.Path] = []
     for path in paths:
-        resolved_paths.extend(
-            pathlib.Path(p.strip()) for p in path.split(" ") if p.strip()
-        )
+        resolved_paths.extend(pathlib.Path(p) for p in path.split())
 
     return resolved_paths
 
 
+@lru_cache(maxsize=1024)
+def _package_name_pattern(package_name: str) -> Optional[re.Pattern]:
+    """
+    Compile a pattern matching a requirements.txt line that consists of the given package
+    name, treating dashes and underscores alike, followed by an optional version
+    specifier. Returns None if no line other than the package name itself can match.
+    """
+
+    # Names mixing dashes and underscores, or containing version specifier characters,
+    # only ever match a line that is exactly the package name.
+    if ("-" in package_name and "_" in package_name) or any(
+        character in package_name for character in "".join(VERSION_SPECIFIERS)
+    ):
+        return None
+
+    name = "[-_]".join(re.escape(part) for part in re.split(r"[-_]", package_name))
+    specifiers = "|".join(map(re.escape, VERSION_SPECIFIERS))
+    return re.compile(rf"\s*{name}\s*(?:(?:{specifiers}).*)?")
+
+
+@lru_cache(maxsize=1024)
+def _package_name_variants(package_name: str) -> Tuple[str, ...]:
+    """Return the package name as written, with underscores and with dashes"""
+
+    return (
+        package_name,
+        package_name.replace("-", "_"),
+        package_name.replace("_", "-"),
+    )
+
+
+@lru_cache(maxsize=4096)
 def check_package_name(package_name: str, line: str) -> bool:
     """Determine if a line in a requirements.txt file contains the given package name"""
 
@@ -82,22 +178,82 @@ def check_package_name(package_name: str, line: str) -> bool:
     if line.startswith("#"):
         return False
 
-    # We make the package name and the line match in terms of dashes and underscores.
-    if "-" in package_name:
-        line = line.replace("_", "-")
-    if "_" in package_name:
-        line = line.replace("-", "_")
-
     # If the line is a package that is being referenced by a local path, we need to
-    # check the last part of the path to see if it matches the package name.
+    # check the last part of the path to see if it matches the package name, after
+    # making the package name and the line match in terms of dashes and underscores.
     if line.startswith("./") or line.startswith("../"):
+        if "_" in package_name:
+            line = line.translate(DASHES_TO_UNDERSCORES)
+        elif "-" in package_name:
+            line = line.translate(UNDERSCORES_TO_DASHES)
         return package_name in line.split("/")[-1]
 
-    # Finally, we remove any sort of version specifier from the line and then check
-    # if the package name matches.
-    line = re.split(r"~=|==|>=|<=|>|<|!=", line)[0].strip()
+    # Otherwise the line has to be the package name followed by an optional version
+    # specifier.
+    pattern = _package_name_pattern(package_name)
+    if pattern is None:
+        return False
+
+    # Most lines spell the package name the same way throughout, which can be settled
+    # with a prefix check before falling back to the pattern.
+    stripped = line.lstrip()
+    if stripped.startswith(_package_name_variants(package_name)):
+        remainder = stripped[len(package_name) :].lstrip()
+        if not remainder or remainder.startswith(VERSION_SPECIFIERS):
+            return True
+
+    return pattern.fullmatch(line) is not None
+
+
+def _read_requirements_file(requirements_file: pathlib.Path) -> List[str]:
+    """Read the lines of a requirements.txt file"""
+
+    with open(requirements_file, encoding="utf-8") as f:
+        return f.read().splitlines()
 
-    return package_name == line
+
+def _write_requirements_file(requirements_file: pathlib.Path, text: str) -> None:
+    """Write the given text to a requirements.txt file"""
+
+    with open(requirements_file, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _read_requirements_files(
+    requirements_files: List[pathlib.Path],
+) -> Iterator[Tuple[pathlib.Path, List[str]]]:
+    """
+    Read requirements.txt files on a thread pool, yielding their lines in the order the
+    files were given. Only the reads run concurrently; callers process each file on the
+    calling thread because sorting changes the process-wide locale.
+    """
+
+    with ThreadPoolExecutor() as executor:
+        contents = executor.map(_read_requirements_file, requirements_files)
+        yield from zip(requirements_files, contents)
+
+
+def apply_update(
+    contents: List[str], package_name: str, version_specifier: str
+) -> Optional[List[str]]:
+    """
+    Replace every line referencing the given package with the new version specifier and
+    sort the result, returning None if the package is not referenced at all
+    """
+
+    updated_contents = []
+    modified = False
+
+    for line in contents:
+        if check_package_name(package_name, line):
+            line = f"{package_name}{version_specifier}"
+            modified = True
+        updated_contents.append(line)
+
+    if not modified:
+        return None
+
+    return sort_packages(updated_contents, locale_=DEFAULT_LOCALE)
 
 
 @click.group(
@@ -129,7 +285,7 @@ def update_package(
 
     # If the version specifier does not start with ==, !=, >=, <=, >, <, or ~=,
     # default to ==.
-    if not version_specifier.startswith(("==", "!=", ">=", "<=", ">", "<", "~=")):
+    if not version_specifier.startswith(VERSION_SPECIFIERS):
         version_specifier = f"=={version_specifier}"
 
     if preview:
@@ -137,24 +293,30 @@ def update_package(
 
     resolved_paths = resolve_paths(paths)
 
-    for requirements_file in gather_requirements_files(resolved_paths):
-        contents = requirements_file.read_text().splitlines()
-        modified = False
+    requirements_files = gather_requirements_files(resolved_paths)
 
-        for index, line in enumerate(contents):
-            if check_package_name(package_name, line):
-                contents[index] = f"{package_name}{version_specifier}"
-                modified = True
-                contents = sort_packages(contents, locale_=DEFAULT_LOCALE)
+    preview_output = []
+    for requirements_file, contents in _read_requirements_files(requirements_files):
+        updated_contents = apply_update(contents, package_name, version_specifier)
 
-        if modified:
+        if updated_contents is not None:
             if preview:
-                click.echo(click.style(requirements_file, fg="cyan", bold=True))
-                click.echo("\n".join(contents).strip() + "\n")
+                preview_output.append(
+                    click.style(requirements_file, fg="cyan", bold=True)
+                )
+                preview_output.append("\n".join(updated_contents).strip() + "\n")
             else:
-                requirements_file.write_text("\n".join(contents).strip() + "\n")
+                # Leave files that already have the requested contents untouched
+                if updated_contents != contents:
+                    _write_requirements_file(
+                        requirements_file, "\n".join(updated_contents).strip() + "\n"
+                    )
                 click.echo(f"Updated {requirements_file}")
 
+    # Write the previewed files at once rather than a line at a time
+    if preview_output:
+        click.echo("\n".join(preview_output))
+
 
 find_help = (
     "Find a package name in requirements.txt files\n\nExample: "
@@ -174,7 +336,7 @@ def find_package(package_name: str, paths: Tuple[str], verbose: bool):
     resolved_paths = resolve_paths(paths)
 
     for requirements_file in gather_requirements_files(resolved_paths):
-        for line in requirements_file.read_text().splitlines():
+        for line in _read_requirements_file(requirements_file):
             if check_package_name(package_name, line):
                 click.echo(requirements_file)
                 if verbose:
@@ -200,7 +362,7 @@ def add_package(package_name: str, paths: Tuple[str], preview: bool):
     resolved_paths = resolve_paths(paths)
 
     for requirements_file in gather_requirements_files(resolved_paths):
-        contents = requirements_file.read_text().splitlines()
+        contents = _read_requirements_file(requirements_file)
         modified = False
 
         for line in contents:
@@ -217,7 +379,9 @@ def add_package(package_name: str, paths: Tuple[str], preview: bool):
                 click.echo(requirements_file)
                 click.echo("\n".join(contents).strip())
             else:
-                requirements_file.write_text("\n".join(contents).strip() + "\n")
+                _write_requirements_file(
+                    requirements_file, "\n".join(contents).strip() + "\n"
+                )
                 click.echo(f"Updated {requirements_file}")
 
 
@@ -240,7 +404,7 @@ def remove_package(package_name: str, paths: Tuple[str], preview: bool):
     resolved_paths = resolve_paths(paths)
 
     for requirements_file in gather_requirements_files(resolved_paths):
-        contents = requirements_file.read_text().splitlines()
+        contents = _read_requirements_file(requirements_file)
         updated_contents = [
             line for line in contents if not check_package_name(package_name, line)
         ]
@@ -251,7 +415,9 @@ def remove_package(package_name: str, paths: Tuple[str], preview: bool):
             click.echo("\n".join(updated_contents).strip() + "\n")
 
         if len(contents) != len(updated_contents):
-            requirements_file.write_text("\n".join(updated_contents) + "\n")
+            _write_requirements_file(
+                requirements_file, "\n".join(updated_contents) + "\n"
+            )
             click.echo(f"Removed {package_name} from {requirements_file}")
 
 
@@ -273,11 +439,13 @@ def sort_requirements(paths: Tuple[str], preview: bool):
     resolved_paths = resolve_paths(paths)
 
     for requirements_file in gather_requirements_files(resolved_paths):
-        contents = requirements_file.read_text().splitlines()
+        contents = _read_requirements_file(requirements_file)
         new_contents = sort_packages(contents, locale_=DEFAULT_LOCALE)
         if contents != new_contents:
             if not preview:
-                requirements_file.write_text("\n".join(new_contents).strip() + "\n")
+                _write_requirements_file(
+                    requirements_file, "\n".join(new_contents).strip() + "\n"
+                )
                 click.echo(f"Sorted {requirements_file}")
             else:
                 click.echo(requirements_file)
@@ -299,10 +467,15 @@ def cat_requirements(paths: Tuple[str]):
 
     resolved_paths = resolve_paths(paths)
 
+    output = []
     for requirements_file in gather_requirements_files(resolved_paths):
-        click.echo(click.style(requirements_file, fg="cyan", bold=True))
-        click.echo(requirements_file.read_text().strip())
-        click.echo()
+        output.append(click.style(requirements_file, fg="cyan", bold=True))
+        output.append("\n".join(_read_requirements_file(requirements_file)).strip())
+        output.append("")
+
+    # Write everything at once rather than a line at a time
+    if output:
+        click.echo("\n".join(output))
 
 
 if __name__ == "__main__":
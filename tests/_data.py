@@ -0,0 +1,6 @@
+"""Static test data shared between fixtures and tests"""
+
+REQUIREMENTS_TXT: bytes = b"pytest\nboto3~=1.0.0\nenhancement-models==1.0.0\n"
+
+# Handler module placed in the AWS SAM build directory fixture
+APP_PY: bytes = b"def handler(event, context):\n    return 'Hello world'"
@@ -0,0 +1,28 @@
+"""Filesystem helpers for asserting on the state of fixture directories"""
+
+import os
+import pathlib
+from typing import Dict, Union
+
+
+def snapshot(root: Union[str, os.PathLike]) -> Dict[str, bytes]:
+    """
+    Map every file below root, keyed by its "/"-separated path relative to root, to its
+    contents so a whole directory tree can be compared in a single assertion
+    """
+
+    files = {}
+    directories = [(os.fspath(root), "")]
+
+    while directories:
+        directory, prefix = directories.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append((entry.path, f"{prefix}{entry.name}/"))
+                else:
+                    files[f"{prefix}{entry.name}"] = pathlib.Path(
+                        entry.path
+                    ).read_bytes()
+
+    return files
@@ -1,54 +1,122 @@
+import os
 import pathlib
-import tempfile
-from typing import Generator
+import shutil
+from typing import Dict, Union
 
 import pytest
 from click.testing import CliRunner
 
+from tests._data import APP_PY, REQUIREMENTS_TXT
 
-@pytest.fixture
+# A requirements.txt file in the root and in three nested directories
+_NESTED_DIRECTORIES: Dict[str, bytes] = {
+    "": REQUIREMENTS_TXT,
+    "directory0": REQUIREMENTS_TXT,
+    "directory1": REQUIREMENTS_TXT,
+    "directory2": REQUIREMENTS_TXT,
+}
+
+
+def _create_requirements_file(
+    directory: Union[str, os.PathLike], contents: bytes
+) -> None:
+    """Create a requirements.txt file in the given directory, creating any parents"""
+
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "requirements.txt"), "wb") as requirements_file:
+        requirements_file.write(contents)
+
+
+def _create_requirements_files(
+    root: Union[str, os.PathLike], contents_by_directory: Dict[str, bytes]
+) -> None:
+    """Create a requirements.txt file in each directory, given relative to the root"""
+
+    for directory, contents in contents_by_directory.items():
+        _create_requirements_file(os.path.join(root, directory), contents)
+
+
+@pytest.fixture(scope="session")
 def cli_runner() -> CliRunner:
-    yield CliRunner()
+    """
+    CliRunner keeps no state between invocations as invoke() sets up fresh output
+    streams each time, so a single runner is shared by the whole session
+    """
 
+    return CliRunner()
 
-@pytest.fixture
-def requirements_txt() -> bytes:
-    return b"pytest\nboto3~=1.0.0\nenhancement-models==1.0.0\n"
+
+@pytest.fixture(scope="session")
+def requirements_file_template(
+    tmp_path_factory: pytest.TempPathFactory,
+) -> pathlib.Path:
+    """
+    Pristine directory with a requirements.txt file, built once per session. Tests that
+    never write to disk, such as --preview tests, may use it directly.
+    """
+
+    directory = tmp_path_factory.mktemp("template")
+    _create_requirements_file(directory, REQUIREMENTS_TXT)
+    return directory
+
+
+@pytest.fixture(scope="session")
+def nested_directories_template(
+    tmp_path_factory: pytest.TempPathFactory,
+) -> pathlib.Path:
+    """Read-only counterpart of multiple_nested_directories, built once per session"""
+
+    directory = tmp_path_factory.mktemp("nested_template")
+    _create_requirements_files(directory, _NESTED_DIRECTORIES)
+    return directory
 
 
 @pytest.fixture
-def single_requirements_file(requirements_txt) -> Generator[str, None, None]:
+def single_requirements_file(
+    tmp_path: pathlib.Path, requirements_file_template: pathlib.Path
+) -> pathlib.Path:
     """Single temporary directory with a requirements.txt file"""
 
-    with tempfile.TemporaryDirectory() as td:
-        directory = pathlib.Path(td)
-        requirements_file = directory / "requirements.txt"
-        requirements_file.write_text(requirements_txt.decode("utf-8"))
-        yield td
+    shutil.copytree(requirements_file_template, tmp_path, dirs_exist_ok=True)
+    return tmp_path
 
 
 @pytest.fixture
-def multiple_nested_directories(requirements_txt) -> Generator[str, None, None]:
+def multiple_nested_directories(
+    tmp_path: pathlib.Path, nested_directories_template: pathlib.Path
+) -> pathlib.Path:
     """
     Multiple temporary nested directories with
     a single requirements.txt file in each
     """
 
-    with tempfile.TemporaryDirectory() as td:
-        for i in range(3):
-            directory = pathlib.Path(td) / f"directory{i}"
-            directory.mkdir()
-            requirements_file = directory / "requirements.txt"
-            requirements_file.write_text(requirements_txt.decode("utf-8"))
-        requirements_file = pathlib.Path(td) / "requirements.txt"
-        requirements_file.write_text(requirements_txt.decode("utf-8"))
-        yield td
+    shutil.copytree(nested_directories_template, tmp_path, dirs_exist_ok=True)
+    return tmp_path
+
+
+@pytest.fixture(scope="session")
+def aws_sam_build_directory_template(
+    tmp_path_factory: pytest.TempPathFactory,
+) -> pathlib.Path:
+    """
+    Pristine counterpart of single_requirements_file_with_aws_sam_build_directory,
+    built once per session
+    """
+
+    directory = tmp_path_factory.mktemp("aws_sam_template")
+    _create_requirements_files(
+        directory,
+        {"": REQUIREMENTS_TXT, ".aws-sam/build/HelloWorldFunction": REQUIREMENTS_TXT},
+    )
+    app_file = directory / ".aws-sam/build/HelloWorldFunction/app.py"
+    app_file.write_bytes(APP_PY)
+    return directory
 
 
 @pytest.fixture
 def single_requirements_file_with_aws_sam_build_directory(
-    requirements_txt,
-) -> Generator[str, None, None]:
+    tmp_path: pathlib.Path, aws_sam_build_directory_template: pathlib.Path
+) -> pathlib.Path:
     """
     A single requirements.txt file that is adjacent to an AWS SAM build directory (.aws-sam/build),
     which should be ignored by the CLI. The AWS SAM build directory contains a single directory called
@@ -56,16 +124,5 @@ def single_requirements_file_with_aws_sam_build_directory(
     contents as the single requirements.txt file.
     """
 
-    with tempfile.TemporaryDirectory() as td:
-        directory = pathlib.Path(td)
-        requirements_file = directory / "requirements.txt"
-        requirements_file.write_text(requirements_txt.decode("utf-8"))
-        sam_build_directory = directory / ".aws-sam/build"
-        sam_build_directory.mkdir(parents=True)
-        hello_world_function_directory = sam_build_directory / "HelloWorldFunction"
-        hello_world_function_directory.mkdir()
-        app_file = hello_world_function_directory / "app.py"
-        app_file.write_text("def handler(event, context):\n    return 'Hello world'")
-        requirements_file = hello_world_function_directory / "requirements.txt"
-        requirements_file.write_text(requirements_txt.decode("utf-8"))
-        yield td
+    shutil.copytree(aws_sam_build_directory_template, tmp_path, dirs_exist_ok=True)
+    return tmp_path
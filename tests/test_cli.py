@@ -1,254 +1,329 @@
-import os
 import pathlib
 
 import pytest
 from src.main import (
     cat_requirements,
     check_package_name,
+    find_package,
     gather_requirements_files,
     update_package,
 )
+from tests._data import APP_PY, REQUIREMENTS_TXT
+from tests._fsutil import snapshot
+
+# Expected contents of REQUIREMENTS_TXT after updating pytest to ~=6.0.0
+PYTEST_UPDATED_REQUIREMENTS_TXT = (
+    "boto3~=1.0.0\nenhancement-models==1.0.0\npytest~=6.0.0\n"
+)
+
+# Expected contents of REQUIREMENTS_TXT after updating enhancement-models to ==2.0.0
+ENHANCEMENT_MODELS_UPDATED_REQUIREMENTS_TXT = (
+    "boto3~=1.0.0\nenhancement-models==2.0.0\npytest\n"
+)
+
+# (package_name, line, expected) cases for check_package_name
+CHECK_PACKAGE_NAME_CASES = (
+    # Direct matches
+    ("example", "example", True),
+    ("example-package", "example_package", True),
+    # With versions
+    ("example", "example==1.2.3", True),
+    ("example-package", "example_package>=1.2.3", True),
+    ("example==1.2.3", "example==1.2.3", True),
+    ("example==1.3.0", "example==1.2.3", False),
+    # Local paths
+    ("mypackage", "./mypackage", True),
+    ("mypackage", "../another_dir/mypackage", True),
+    ("mypackage", "../../mypackage", True),
+    ("mypackage", "./another_dir/mypackage_1.2.3.tar.gz", True),
+    # Non-matches
+    ("example", "example_other", False),
+    ("example-package", "example_other_package", False),
+    ("mypackage", "./another-package", False),
+    # Version specifiers with non-matching packages
+    ("example", "example_other>=1.2.3", False),
+    # Edge cases with underscore and dash differences
+    ("example-package", "example_package>=1.2.3", True),
+    ("example_package", "example-package==1.2.3", True),
+    # Testing for package names with version specifiers
+    ("example", "example[extra]==1.2.3", False),
+    ("example_package", "example-package[extra]>=1.2.3", False),
+    ("example-package", "example_package[extra]==1.2.3", False),
+)
+
+
+def _update(package_name: str, version_specifier: str, *paths: str) -> None:
+    """Run the update command directly, bypassing Click's argument parsing"""
+
+    callback = update_package.callback
+    assert callback is not None
+    callback(
+        package_name=package_name,
+        version_specifier=version_specifier,
+        paths=paths,
+        preview=False,
+    )
 
 
 class TestGatherRequirementsFiles:
     """Test functionality when locating requirements.txt files"""
 
-    def test_single_requirements_file(self, single_requirements_file) -> None:
-        filepath = pathlib.Path(single_requirements_file)
+    def test_single_requirements_file(self, requirements_file_template) -> None:
+        filepath = requirements_file_template
         files = gather_requirements_files([filepath])
         assert len(files) == 1
 
-    def test_multiple_requirements_files(self, multiple_nested_directories) -> None:
-        filepath = pathlib.Path(multiple_nested_directories)
+    def test_multiple_requirements_files(self, nested_directories_template) -> None:
+        filepath = nested_directories_template
         files = gather_requirements_files([filepath])
         assert len(files) == 4
 
+    @pytest.mark.parametrize("directory_name", ["venv", ".venv", "virtualenv"])
+    def test_excludes_virtual_environment_directories(
+        self, single_requirements_file, directory_name
+    ) -> None:
+        filepath = single_requirements_file
+        virtual_environment = filepath / directory_name
+        virtual_environment.mkdir()
+        (virtual_environment / "requirements.txt").write_bytes(REQUIREMENTS_TXT)
+        files = gather_requirements_files([filepath])
+        assert files == [filepath / "requirements.txt"]
+
+    @pytest.mark.parametrize(
+        "directory_name", [".git", "__pycache__", "node_modules", "site-packages"]
+    )
+    def test_skips_non_project_directories(
+        self, single_requirements_file, directory_name
+    ) -> None:
+        skipped_directory = single_requirements_file / directory_name
+        skipped_directory.mkdir()
+        (skipped_directory / "requirements.txt").write_bytes(REQUIREMENTS_TXT)
+        files = gather_requirements_files([single_requirements_file])
+        assert files == [single_requirements_file / "requirements.txt"]
+
+    def test_excludes_root_inside_excluded_directory(
+        self, single_requirements_file_with_aws_sam_build_directory
+    ) -> None:
+        build_directory = (
+            single_requirements_file_with_aws_sam_build_directory / ".aws-sam/build"
+        )
+        assert gather_requirements_files([build_directory]) == []
+        assert (
+            gather_requirements_files(
+                [build_directory / "HelloWorldFunction" / "requirements.txt"]
+            )
+            == []
+        )
+
+    def test_excludes_current_directory_inside_virtual_environment(
+        self, cli_runner, single_requirements_file, monkeypatch
+    ) -> None:
+        package_directory = single_requirements_file / ".venv" / "lib" / "package"
+        package_directory.mkdir(parents=True)
+        (package_directory / "requirements.txt").write_bytes(REQUIREMENTS_TXT)
+        monkeypatch.chdir(package_directory)
+        result = cli_runner.invoke(find_package, ["pytest"], catch_exceptions=False)
+        assert result.output == ""
+        assert gather_requirements_files([pathlib.Path(".")]) == []
+
+    def test_skips_symlinks(self, single_requirements_file, tmp_path_factory) -> None:
+        target = tmp_path_factory.mktemp("symlink_target")
+        (target / "requirements.txt").write_bytes(REQUIREMENTS_TXT)
+        (single_requirements_file / "linked").symlink_to(target)
+        (single_requirements_file / "nested").mkdir()
+        (single_requirements_file / "nested" / "requirements.txt").symlink_to(
+            target / "requirements.txt"
+        )
+        files = gather_requirements_files([single_requirements_file])
+        assert files == [single_requirements_file / "requirements.txt"]
+
 
 def test_single_requirements_file_in_directory(
     single_requirements_file, cli_runner
 ) -> None:
     result = cli_runner.invoke(
-        update_package, ["pytest", "~=6.0.0", single_requirements_file]
+        update_package,
+        ["pytest", "~=6.0.0", str(single_requirements_file)],
+        catch_exceptions=False,
     )
     assert result.exit_code == 0
-    contents = (pathlib.Path(single_requirements_file) / "requirements.txt").read_text()
-    assert contents == "boto3~=1.0.0\nenhancement-models==1.0.0\npytest~=6.0.0\n"
+    contents = (single_requirements_file / "requirements.txt").read_text()
+    assert contents == PYTEST_UPDATED_REQUIREMENTS_TXT
 
 
 def test_multiple_requirements_files(cli_runner, multiple_nested_directories) -> None:
     result = cli_runner.invoke(
-        update_package, ["pytest", "~=6.0.0", multiple_nested_directories]
+        update_package,
+        ["pytest", "~=6.0.0", str(multiple_nested_directories)],
+        catch_exceptions=False,
     )
     assert result.exit_code == 0
-    for i in range(3):
-        contents = (
-            pathlib.Path(multiple_nested_directories)
-            / f"directory{i}"
-            / "requirements.txt"
-        ).read_text()
-        assert contents == "boto3~=1.0.0\nenhancement-models==1.0.0\npytest~=6.0.0\n"
+    requirements_files = sorted(
+        multiple_nested_directories.glob("directory[0-2]/requirements.txt")
+    )
+    assert len(requirements_files) == 3
+    for requirements_file in requirements_files:
+        assert requirements_file.read_text() == PYTEST_UPDATED_REQUIREMENTS_TXT
 
 
 class TestPreviewChanges:
     """Test previewing changes against files"""
 
     def test_single_requirements_file(
-        self, cli_runner, single_requirements_file
+        self, cli_runner, requirements_file_template
     ) -> None:
         result = cli_runner.invoke(
             update_package,
             [
                 "pytest",
                 "~=6.0.0",
-                single_requirements_file,
+                str(requirements_file_template),
                 "--preview",
             ],
+            catch_exceptions=False,
         )
         assert result.exit_code == 0
         assert (
-            result.output == f"Previewing changes\n{single_requirements_file}/"
-            f"requirements.txt\nboto3~=1.0.0\nenhancement-models==1.0.0\npytest~=6.0.0\n\n"
+            result.output == f"Previewing changes\n{requirements_file_template}/"
+            f"requirements.txt\n{PYTEST_UPDATED_REQUIREMENTS_TXT}\n"
         )
 
         # assert that file contents are unchanged
-        contents = (
-            pathlib.Path(single_requirements_file) / "requirements.txt"
-        ).read_text()
-        assert contents == "pytest\nboto3~=1.0.0\nenhancement-models==1.0.0\n"
+        contents = (requirements_file_template / "requirements.txt").read_bytes()
+        assert contents == REQUIREMENTS_TXT
 
     def test_multiple_requirements_files(
-        self, cli_runner, multiple_nested_directories
+        self, cli_runner, nested_directories_template
     ) -> None:
         result = cli_runner.invoke(
             update_package,
             [
                 "pytest",
                 "pytest~=6.0.0",
-                multiple_nested_directories,
+                str(nested_directories_template),
                 "--preview",
             ],
+            catch_exceptions=False,
         )
         assert result.exit_code == 0
 
+        # assert that file contents are unchanged
+        assert snapshot(nested_directories_template) == {
+            "requirements.txt": REQUIREMENTS_TXT,
+            "directory0/requirements.txt": REQUIREMENTS_TXT,
+            "directory1/requirements.txt": REQUIREMENTS_TXT,
+            "directory2/requirements.txt": REQUIREMENTS_TXT,
+        }
 
-@pytest.mark.parametrize(
-    "package_name, line, expected",
-    [
-        # Direct matches
-        ("example", "example", True),
-        ("example-package", "example_package", True),
-        # With versions
-        ("example", "example==1.2.3", True),
-        ("example-package", "example_package>=1.2.3", True),
-        ("example==1.2.3", "example==1.2.3", True),
-        ("example==1.3.0", "example==1.2.3", False),
-        # Local paths
-        ("mypackage", "./mypackage", True),
-        ("mypackage", "../another_dir/mypackage", True),
-        ("mypackage", "../../mypackage", True),
-        ("mypackage", "./another_dir/mypackage_1.2.3.tar.gz", True),
-        # Non-matches
-        ("example", "example_other", False),
-        ("example-package", "example_other_package", False),
-        ("mypackage", "./another-package", False),
-        # Version specifiers with non-matching packages
-        ("example", "example_other>=1.2.3", False),
-        # Edge cases with underscore and dash differences
-        ("example-package", "example_package>=1.2.3", True),
-        ("example_package", "example-package==1.2.3", True),
-        # Testing for package names with version specifiers
-        ("example", "example[extra]==1.2.3", False),
-        ("example_package", "example-package[extra]>=1.2.3", False),
-        ("example-package", "example_package[extra]==1.2.3", False),
-    ],
-)
+
+@pytest.mark.parametrize("package_name, line, expected", CHECK_PACKAGE_NAME_CASES)
 def test_check_package_name(package_name, line, expected) -> None:
     assert check_package_name(package_name, line) == expected
 
 
-def test_cat_requirements(cli_runner, single_requirements_file) -> None:
-    result = cli_runner.invoke(cat_requirements, [single_requirements_file])
+def test_cat_requirements(cli_runner, requirements_file_template) -> None:
+    result = cli_runner.invoke(
+        cat_requirements, [str(requirements_file_template)], catch_exceptions=False
+    )
     assert result.exit_code == 0
     assert (
         result.output
-        == f"{single_requirements_file}/requirements.txt\npytest\nboto3~=1.0.0\nenhancement-models==1.0.0\n\n"
+        == f"{requirements_file_template}/requirements.txt\npytest\nboto3~=1.0.0\nenhancement-models==1.0.0\n\n"
     )
 
 
-def test_replace_package_with_hyphen(cli_runner, single_requirements_file) -> None:
-    """Test replacing a package with a hyphen in the name"""
-
-    cli_runner.invoke(
-        update_package,
-        [
-            "enhancement_models",
-            "==2.0.0",
-            single_requirements_file,
-        ],
-    )
-    contents = (pathlib.Path(single_requirements_file) / "requirements.txt").read_text()
-    assert contents == "boto3~=1.0.0\nenhancement_models==2.0.0\npytest\n"
-
+@pytest.mark.parametrize(
+    "package_name",
+    [
+        # Package name with an underscore, existing line uses a hyphen
+        "enhancement_models",
+        # Package name with a hyphen, existing line uses a hyphen
+        "enhancement-models",
+    ],
+)
+def test_replace_package_with_hyphen_or_underscore(
+    single_requirements_file, package_name
+) -> None:
+    """Test replacing a package regardless of hyphens or underscores in the name"""
 
-def test_replace_package_with_underscore(cli_runner, single_requirements_file):
-    """Test replacing a package with an underscore in the name"""
-
-    cli_runner.invoke(
-        update_package,
-        [
-            "enhancement-models",
-            "==2.0.0",
-            single_requirements_file,
-        ],
-    )
-    contents = (pathlib.Path(single_requirements_file) / "requirements.txt").read_text()
-    assert contents == "boto3~=1.0.0\nenhancement-models==2.0.0\npytest\n"
+    _update(package_name, "==2.0.0", str(single_requirements_file))
+    contents = (single_requirements_file / "requirements.txt").read_text()
+    assert contents == f"boto3~=1.0.0\n{package_name}==2.0.0\npytest\n"
 
 
 def test_multiple_paths_argument(cli_runner, multiple_nested_directories) -> None:
     """Test passing in multiple paths to the CLI"""
 
+    root = multiple_nested_directories
     cli_runner.invoke(
         update_package,
         [
             "enhancement-models",
             "==2.0.0",
-            f"{multiple_nested_directories}/directory0/requirements.txt  {multiple_nested_directories}/directory1/requirements.txt",  # noqa
+            f"{root}/directory0/requirements.txt  {root}/directory1/requirements.txt",
         ],
+        catch_exceptions=False,
     )
-    for i in range(3):
-        if i > 1:
-            break
-        contents = (
-            pathlib.Path(multiple_nested_directories)
-            / f"directory{i}"
-            / "requirements.txt"
-        ).read_text()
-        assert contents == "boto3~=1.0.0\nenhancement-models==2.0.0\npytest\n"
-
-
-def test_replace_without_paths(cli_runner, single_requirements_file) -> None:
+    contents = [
+        (root / directory / "requirements.txt").read_text()
+        for directory in ("directory0", "directory1")
+    ]
+    assert contents == [ENHANCEMENT_MODELS_UPDATED_REQUIREMENTS_TXT] * 2
+
+
+def test_replace_without_paths(single_requirements_file, monkeypatch) -> None:
     """Test replacing a package without passing in paths"""
 
     # Change directory to parent directory of single_requirements_file
     # for the duration of this test
-    current_directory = os.getcwd()
-    os.chdir(pathlib.Path(single_requirements_file).parent)
+    monkeypatch.chdir(single_requirements_file.parent)
 
-    cli_runner.invoke(
-        update_package,
-        [
-            "enhancement-models",
-            "==2.0.0",
-        ],
-    )
-    os.chdir(current_directory)
-    contents = (pathlib.Path(single_requirements_file) / "requirements.txt").read_text()
-    assert contents == "boto3~=1.0.0\nenhancement-models==2.0.0\npytest\n"
+    _update("enhancement-models", "==2.0.0")
+    contents = (single_requirements_file / "requirements.txt").read_text()
+    assert contents == ENHANCEMENT_MODELS_UPDATED_REQUIREMENTS_TXT
 
 
-def test_update_without_version_specifier(cli_runner, single_requirements_file) -> None:
+def test_update_without_version_specifier(single_requirements_file) -> None:
     """Test updating a package without passing in a version specifier"""
 
-    cli_runner.invoke(
-        update_package,
-        [
-            "enhancement-models",
-            "1.0.0",
-            single_requirements_file,
-        ],
-    )
-    contents = (pathlib.Path(single_requirements_file) / "requirements.txt").read_text()
+    _update("enhancement-models", "1.0.0", str(single_requirements_file))
+    contents = (single_requirements_file / "requirements.txt").read_text()
     assert contents == "boto3~=1.0.0\nenhancement-models==1.0.0\npytest\n"
 
 
+def test_update_package_referenced_on_multiple_lines(tmp_path) -> None:
+    """Test that every line referencing a package is updated"""
+
+    requirements_file = tmp_path / "requirements.txt"
+    requirements_file.write_text("./libs/mypackage\nboto3\nmypackage==1.0.0\n")
+    _update("mypackage", "2.0.0", str(tmp_path))
+    contents = requirements_file.read_text()
+    assert contents == "boto3\nmypackage==2.0.0\nmypackage==2.0.0\n"
+
+
+def test_update_leaves_up_to_date_file_untouched(tmp_path, capsys) -> None:
+    """Test that a file already at the requested version is not rewritten"""
+
+    requirements_file = tmp_path / "requirements.txt"
+    requirements_file.write_text("boto3\nmypackage==2.0.0")
+    _update("mypackage", "2.0.0", str(tmp_path))
+    assert capsys.readouterr().out == f"Updated {requirements_file}\n"
+    assert requirements_file.read_text() == "boto3\nmypackage==2.0.0"
+
+
 def test_update_with_aws_sam_directory(
-    cli_runner, single_requirements_file_with_aws_sam_build_directory
+    single_requirements_file_with_aws_sam_build_directory,
 ) -> None:
     """Test updating a package with an AWS SAM directory"""
 
-    cli_runner.invoke(
-        update_package,
-        [
-            "enhancement-models",
-            "5.0.0",
-            single_requirements_file_with_aws_sam_build_directory,
-        ],
+    _update(
+        "enhancement-models",
+        "5.0.0",
+        str(single_requirements_file_with_aws_sam_build_directory),
     )
-    contents = (
-        pathlib.Path(single_requirements_file_with_aws_sam_build_directory)
-        / "requirements.txt"
-    ).read_text()
-    assert contents == "boto3~=1.0.0\nenhancement-models==5.0.0\npytest\n"
-
-    # also assert that the AWS SAM build directory is unchanged
-    sam_build_directory = (
-        pathlib.Path(single_requirements_file_with_aws_sam_build_directory)
-        / ".aws-sam/build"
-    )
-    assert sam_build_directory.exists()
-    assert len(list(sam_build_directory.iterdir())) == 1
-    assert (sam_build_directory / "HelloWorldFunction" / "app.py").exists()
-    assert (
-        sam_build_directory / "HelloWorldFunction" / "requirements.txt"
-    ).read_text() == "pytest\nboto3~=1.0.0\nenhancement-models==1.0.0\n"
+    # The root file is updated and the AWS SAM build directory is left unchanged
+    assert snapshot(single_requirements_file_with_aws_sam_build_directory) == {
+        "requirements.txt": b"boto3~=1.0.0\nenhancement-models==5.0.0\npytest\n",
+        ".aws-sam/build/HelloWorldFunction/app.py": APP_PY,
+        ".aws-sam/build/HelloWorldFunction/requirements.txt": REQUIREMENTS_TXT,
+    }